@@ -1,6 +1,16 @@
+import os
+
+# eventlet has to patch the stdlib before anything else imports socket/threading.
+if os.getenv("MEMCTRL_ASYNC_MODE", "threading") == "eventlet":
+    import eventlet
+
+    eventlet.monkey_patch()
+
+import collections
+import functools
 import json
 import logging
-import os
+import re
 import socket
 import subprocess
 import sys
@@ -12,6 +22,11 @@ from typing import Any, Optional
 from flask import Flask, abort, render_template, request
 from flask_socketio import SocketIO, emit
 
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
 
 @dataclass(frozen=True)
 class Settings:
@@ -23,6 +38,9 @@ class Settings:
     relay_port: int
     autostart_host: bool
     socketio_debug: bool
+    relay_flush_hz: int
+    async_mode: str
+    log_level: str
 
 
 def load_settings() -> Settings:
@@ -35,37 +53,195 @@ def load_settings() -> Settings:
         relay_port=int(os.getenv("MEMCTRL_RELAY_PORT", "8765")),
         autostart_host=os.getenv("MEMCTRL_AUTOSTART_HOST", "0") in {"1", "true", "True"},
         socketio_debug=os.getenv("MEMCTRL_SOCKETIO_DEBUG", "0") in {"1", "true", "True"},
+        # Rate at which coalesced move/scroll/stick updates are forwarded; 0 sends every event.
+        relay_flush_hz=int(os.getenv("MEMCTRL_RELAY_FLUSH_HZ", "120")),
+        # "threading" (Werkzeug, default) or "eventlet" (requirements-eventlet.txt).
+        async_mode=os.getenv("MEMCTRL_ASYNC_MODE", "threading"),
+        log_level=os.getenv("MEMCTRL_LOG_LEVEL", "INFO").upper(),
     )
 
 
 settings = load_settings()
 
+# getLevelName() maps a known name to its number and anything else to a "Level ..." string.
+_log_level = logging.getLevelName(settings.log_level)
+logging.basicConfig(
+    level=_log_level if isinstance(_log_level, int) else logging.INFO,
+    format="[%(asctime)s] %(message)s",
+    datefmt="%H:%M:%S",
+    stream=sys.stdout,
+)
 logging.getLogger("werkzeug").setLevel(logging.ERROR)
+_logger = logging.getLogger("memctrl")
+if not isinstance(_log_level, int):
+    _logger.warning("Unknown MEMCTRL_LOG_LEVEL %r; using INFO", settings.log_level)
+
+
+def _log(msg: str, *args: Any) -> None:
+    # Arguments are %-formatted lazily, so nothing is built when INFO is filtered out.
+    if _logger.isEnabledFor(logging.INFO):
+        _logger.info(msg, *args)
+
+
+# RPC ids carry their slot index in the low bits and a sequence number above it,
+# so a late reply for a recycled slot is recognised as stale and dropped.
+_RPC_SLOT_BITS = 16
+_RPC_SLOT_MASK = (1 << _RPC_SLOT_BITS) - 1
+
+# host.py writes "t" (and "id" for rpc_result) first, so replies can be routed
+# from the raw line before paying for a full decode.
+_RPC_RESULT_RE = re.compile(rb'\{"t":"rpc_result","id":(\d+)')
+
+_RELAY_SOCK_BUF = 256 * 1024
+# Linux-only; Linux also drops quick-ack mode again after a while, so the reader re-arms it.
+_TCP_QUICKACK = getattr(socket, "TCP_QUICKACK", None)
+# Windows-only; host.py enables it on its listener too, and both ends must opt in before connecting.
+_SIO_LOOPBACK_FAST_PATH = getattr(socket, "SIO_LOOPBACK_FAST_PATH", None)
+
+# Wire frames for the fixed-shape high-rate events; only the numbers vary.
+_MOVE_TMPL = b'{"t":"input","e":"move","d":{"dx":%.5f,"dy":%.5f}}\n'
+_SCROLL_TMPL = b'{"t":"input","e":"scroll","d":{"dy":%.5f}}\n'
+_STICK_TMPL = {
+    e: b'{"t":"input","e":"%s","d":{"x":%%.5f,"y":%%.5f}}\n' % e.encode() for e in ("pad_left", "pad_right")
+}
+_TRIGGER_TMPL = {
+    w: b'{"t":"input","e":"pad_trigger","d":{"which":"%s","value":%%.5f}}\n' % w.encode() for w in ("lt", "rt")
+}
+_PAD_BUTTON_FRAMES = {
+    (name, down): b'{"t":"input","e":"pad_button","d":{"name":"%s","down":%s}}\n'
+    % (name.encode(), b"true" if down else b"false")
+    for name in ("a", "b", "x", "y", "lb", "rb", "back", "start", "ls", "rs", "dup", "ddown", "dleft", "dright")
+    for down in (True, False)
+}
+
+
+def _fmt_ok(v: Any) -> bool:
+    # %.5f would accept bools and emit nan/inf, which is not valid JSON; those take the generic encoder.
+    return (type(v) is float or type(v) is int) and -1e15 < v < 1e15
+
+
+def _encode_line(payload: dict[str, Any]) -> bytes:
+    if orjson is not None:
+        # orjson already emits compact UTF-8 bytes; let it add the newline instead of copying.
+        return orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(payload, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _decode_line(line: bytes) -> Any:
+    if orjson is not None:
+        # orjson parses the raw bytes without an intermediate str.
+        return orjson.loads(line)
+    return json.loads(line.decode("utf-8"))
+
+
+def _arm_quickack(s: socket.socket) -> None:
+    if _TCP_QUICKACK is None:
+        return
+    try:
+        s.setsockopt(socket.IPPROTO_TCP, _TCP_QUICKACK, 1)
+    except OSError:
+        pass
 
-def _log(msg: str) -> None:
-    ts = time.strftime("%H:%M:%S")
-    print(f"[{ts}] {msg}")
+
+def _open_relay_socket(host: str, port: int, timeout: float) -> socket.socket:
+    # create_connection() would connect before the fast-path ioctl and buffer sizes
+    # could be applied (the receive buffer sets the negotiated window scale). Like it, try every resolved address: "localhost" often yields ::1 first while
+    # host.py only listens on IPv4.
+    err: Optional[OSError] = None
+    for family, type_, proto, _, addr in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM):
+        s = socket.socket(family, type_, proto)
+        try:
+            if _SIO_LOOPBACK_FAST_PATH is not None:
+                try:
+                    s.ioctl(_SIO_LOOPBACK_FAST_PATH, True)
+                except OSError:
+                    pass
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _RELAY_SOCK_BUF)
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _RELAY_SOCK_BUF)
+            s.settimeout(timeout)
+            s.connect(addr)
+            return s
+        except OSError as exc:
+            err = exc
+            s.close()
+        except BaseException:
+            s.close()
+            raise
+    if err is not None:
+        raise err
+    raise OSError("getaddrinfo returned an empty list")
+
+
+def _move_frame(dx: float, dy: float) -> bytes:
+    if _fmt_ok(dx) and _fmt_ok(dy):
+        return _MOVE_TMPL % (dx, dy)
+    return _encode_line({"t": "input", "e": "move", "d": {"dx": dx, "dy": dy}})
+
+
+def _scroll_frame(dy: float) -> bytes:
+    if _fmt_ok(dy):
+        return _SCROLL_TMPL % dy
+    return _encode_line({"t": "input", "e": "scroll", "d": {"dy": dy}})
 
 
 class RelayClient:
-    def __init__(self, host: str, port: int) -> None:
+    def __init__(self, host: str, port: int, flush_hz: int = 0) -> None:
         self._host = host
         self._port = port
         self._sock: Optional[socket.socket] = None
         self._lock = threading.Lock()
         self._stop = threading.Event()
-        self._rx_buf = b""
+        self._rx_buf = bytearray()
+        self._rx_scan = 0
+        # Reused for every recv so the read path never allocates a fresh bytes object.
+        self._recv_scratch = bytearray(8192)
+        self._recv_mv = memoryview(self._recv_scratch)
 
         self._pending_lock = threading.Lock()
-        self._pending: dict[str, tuple[threading.Event, dict[str, Any]]] = {}
+        self._slots: list[threading.Event] = []
+        # The decoded rpc_result frame itself becomes the reply, so no dict is built per call.
+        self._slot_results: list[Optional[dict[str, Any]]] = []
+        self._slot_ids: list[int] = []
+        self._free_slots: list[int] = []
+        self._grow_slots(32)
         self._next_id = 1
 
+        # High-rate streams are coalesced between flush ticks: deltas are summed,
+        # absolute stick samples keep only the newest value.
+        self._flush_period = 1.0 / float(min(1000, flush_hz)) if flush_hz > 0 else 0.0
+        self._coalesce_lock = threading.Lock()
+        self._pending_move = [0.0, 0.0]
+        self._pending_scroll = [0.0]
+        self._pending_latest: dict[str, bytes] = {}
+        self._pending_dirty = False
+        self._flush_wake = threading.Event()
+
         self.connected = False
         self.capabilities = {"mouse": False, "keyboard": False, "gamepad": False}
         self.last_status: dict[str, Any] = {}
 
+        # Handlers only enqueue frames; the relay-writer thread owns every sendall
+        # and writes whatever has piled up since its last wake in one call. Each
+        # connection gets its own queue, so frames never cross a reconnect.
+        self._tx_queue: collections.deque[bytes] = collections.deque()
+        self._tx_event = threading.Event()
+
         self._thread = threading.Thread(target=self._run, name="relay-client", daemon=True)
         self._thread.start()
+        self._tx_thread = threading.Thread(target=self._tx_run, name="relay-writer", daemon=True)
+        self._tx_thread.start()
+        if self._flush_period:
+            self._flush_thread = threading.Thread(target=self._flush_run, name="relay-flush", daemon=True)
+            self._flush_thread.start()
+
+    def _grow_slots(self, count: int) -> None:
+        # Caller holds _pending_lock (or is __init__).
+        start = len(self._slots)
+        for _ in range(count):
+            self._slots.append(threading.Event())
+            self._slot_results.append(None)
+            self._slot_ids.append(0)
+        self._free_slots.extend(range(start + count - 1, start - 1, -1))
 
     def _close(self) -> None:
         with self._lock:
@@ -73,45 +249,103 @@ class RelayClient:
             self._sock = None
             self.connected = False
         if s:
+            try:
+                # Wakes a reader blocked in recv; close() alone does not on every platform.
+                s.shutdown(socket.SHUT_RDWR)
+            except Exception:
+                pass
             try:
                 s.close()
             except Exception:
                 pass
 
     def _send_line(self, payload: dict[str, Any]) -> bool:
-        data = (json.dumps(payload, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
-        with self._lock:
-            if not self._sock:
-                return False
+        return self._send_bytes(_encode_line(payload))
+
+    def _send_bytes(self, data: bytes) -> bool:
+        if not self.connected:
+            return False
+        self._tx_queue.append(data)
+        if not self._tx_event.is_set():
+            self._tx_event.set()
+        return True
+
+    def _tx_run(self) -> None:
+        while not self._stop.is_set():
+            self._tx_event.wait()
+            self._tx_event.clear()
+            with self._lock:
+                s = self._sock
+                q = self._tx_queue
+            if not q:
+                continue
+            frames = []
+            while q:
+                frames.append(q.popleft())
+            if s is None:
+                continue
             try:
-                self._sock.sendall(data)
-                return True
+                s.sendall(b"".join(frames))
             except Exception:
-                self._sock = None
-                self.connected = False
-                return False
-
-    def _read_line(self, timeout_s: float) -> Optional[dict[str, Any]]:
-        with self._lock:
+                # Let the reader notice and run the reconnect path, unless a newer
+                # connection has already replaced this one.
+                with self._lock:
+                    if self._sock is s:
+                        self.connected = False
+                try:
+                    s.shutdown(socket.SHUT_RDWR)
+                except Exception:
+                    pass
+
+    def _read_line(self, timeout_s: Optional[float]) -> Optional[bytes]:
+        buf = self._rx_buf
+        # Only scan bytes that arrived since the last miss.
+        n = buf.find(b"\n", self._rx_scan)
+        if n < 0:
+            # Frames often arrive back to back in one segment; the socket is only
+            # touched when the buffer has no complete line. The reader thread is the
+            # only one receiving, so reading self._sock needs no lock.
             s = self._sock
-        if not s:
-            return None
-        s.settimeout(timeout_s)
-        try:
-            while b"\n" not in self._rx_buf:
-                chunk = s.recv(4096)
-                if not chunk:
-                    return None
-                self._rx_buf += chunk
-            line, self._rx_buf = self._rx_buf.split(b"\n", 1)
-            return json.loads(line.decode("utf-8"))
-        except Exception:
-            return None
-        finally:
+            if not s:
+                return None
             try:
-                s.settimeout(None)
+                if timeout_s is not None:
+                    s.settimeout(timeout_s)
+                while n < 0:
+                    self._rx_scan = len(buf)
+                    got = s.recv_into(self._recv_mv)
+                    if not got:
+                        return None
+                    _arm_quickack(s)
+                    buf.extend(self._recv_mv[:got])
+                    n = buf.find(b"\n", self._rx_scan)
             except Exception:
-                pass
+                return None
+            finally:
+                if timeout_s is not None:
+                    try:
+                        s.settimeout(None)
+                    except Exception:
+                        pass
+        line = bytes(buf[:n])
+        del buf[: n + 1]
+        self._rx_scan = 0
+        return line
+
+    def _handle_line(self, line: bytes) -> None:
+        m = _RPC_RESULT_RE.match(line)
+        if m:
+            # Late replies for timed-out calls are dropped without being parsed.
+            req_id = int(m.group(1))
+            idx = req_id & _RPC_SLOT_MASK
+            if idx >= len(self._slot_ids) or self._slot_ids[idx] != req_id:
+                return
+        try:
+            msg = _decode_line(line)
+        except ValueError:
+            return
+        if isinstance(msg, dict):
+            self._handle_incoming(msg)
 
     def _handle_incoming(self, msg: dict[str, Any]) -> None:
         t = msg.get("t")
@@ -124,30 +358,40 @@ class RelayClient:
             }
             return
         if t == "rpc_result":
-            req_id = str(msg.get("id") or "")
+            req_id = msg.pop("id", None)
+            if type(req_id) is not int:
+                return
+            idx = req_id & _RPC_SLOT_MASK
+            # msg was freshly decoded and nobody else holds it; trim it down to the reply shape.
+            del msg["t"]
+            msg["ok"] = bool(msg.get("ok", False))
+            msg.setdefault("error", None)
+            msg.setdefault("result", None)
             with self._pending_lock:
-                pending = self._pending.get(req_id)
-                if not pending:
+                if idx >= len(self._slot_ids) or self._slot_ids[idx] != req_id:
                     return
-                ev, box = pending
-                box.update(msg)
-                ev.set()
+                self._slot_results[idx] = msg
+                self._slots[idx].set()
             return
 
     def _connect_once(self) -> None:
-        s = socket.create_connection((self._host, self._port), timeout=1.5)
+        s = _open_relay_socket(self._host, self._port, timeout=1.5)
         s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        _arm_quickack(s)
         with self._lock:
+            # Handshake goes first on the fresh queue, ahead of anything a handler
+            # enqueues once connected flips.
+            self._tx_queue = collections.deque((_encode_line({"t": "hello", "v": 1}),))
             self._sock = s
             self.connected = True
-            self._rx_buf = b""
+            self._rx_buf = bytearray()
+            self._rx_scan = 0
+        self._tx_event.set()
 
-        # Handshake.
-        self._send_line({"t": "hello", "v": 1})
-        msg = self._read_line(timeout_s=1.5)
-        if msg and isinstance(msg, dict):
-            self._handle_incoming(msg)
-        _log(f"Connected to host relay {self._host}:{self._port}")
+        line = self._read_line(timeout_s=1.5)
+        if line:
+            self._handle_line(line)
+        _log("Connected to host relay %s:%s", self._host, self._port)
 
     def _run(self) -> None:
         while not self._stop.is_set():
@@ -158,54 +402,163 @@ class RelayClient:
                 time.sleep(0.5)
                 continue
 
-            while self.connected and not self._stop.is_set():
-                msg = self._read_line(timeout_s=0.5)
-                if not msg:
-                    continue
-                if isinstance(msg, dict):
-                    self._handle_incoming(msg)
-            _log("Host relay disconnected; reconnecting...")
+            # Block until data arrives; stop() and write failures shut the socket down,
+            # which fails the recv and lands here instead of polling on a timeout.
+            while not self._stop.is_set():
+                line = self._read_line(timeout_s=None)
+                if line is None:
+                    break
+                if line:
+                    self._handle_line(line)
+            self._close()
+            if not self._stop.is_set():
+                _log("Host relay disconnected; reconnecting...")
 
     def stop(self) -> None:
         self._stop.set()
+        self._flush_wake.set()
+        self._tx_event.set()
         self._close()
 
+    def _flush_pending_locked(self) -> None:
+        # Caller holds _coalesce_lock.
+        self._pending_dirty = False
+        move = self._pending_move
+        if move[0] or move[1]:
+            self._send_bytes(_move_frame(move[0], move[1]))
+            move[0] = move[1] = 0.0
+        scroll = self._pending_scroll
+        if scroll[0]:
+            self._send_bytes(_scroll_frame(scroll[0]))
+            scroll[0] = 0.0
+        if self._pending_latest:
+            for frame in self._pending_latest.values():
+                self._send_bytes(frame)
+            self._pending_latest.clear()
+
+    def _mark_dirty_locked(self) -> None:
+        if not self._pending_dirty:
+            self._pending_dirty = True
+            self._flush_wake.set()
+
+    def _flush_run(self) -> None:
+        period = self._flush_period
+        perf_counter = time.perf_counter
+        next_tick = 0.0
+        while not self._stop.is_set():
+            self._flush_wake.wait()
+            self._flush_wake.clear()
+            # Flushes sit on a fixed grid like MouseMover's ticks: a sample arriving after
+            # an idle period goes out at once, and only samples landing within one period
+            # of the last flush wait for the next tick and coalesce into it.
+            slack = next_tick - perf_counter()
+            if slack > 0.0005:
+                time.sleep(slack)
+            now = perf_counter()
+            next_tick += period
+            if next_tick < now:
+                next_tick = now + period
+            with self._coalesce_lock:
+                self._flush_pending_locked()
+
+    def _send_ordered(self, data: bytes) -> bool:
+        # Anything still coalescing happened before this event, so it goes out first.
+        with self._coalesce_lock:
+            if self._pending_dirty:
+                self._flush_pending_locked()
+            return self._send_bytes(data)
+
     def send_client_state(self, state: str, meta: dict[str, Any]) -> None:
-        self._send_line({"t": "client", "state": state, "meta": meta})
+        self._send_ordered(_encode_line({"t": "client", "state": state, "meta": meta}))
 
     def send_input(self, event: str, data: dict[str, Any]) -> None:
-        self._send_line({"t": "input", "e": event, "d": data})
+        self._send_ordered(_encode_line({"t": "input", "e": event, "d": data}))
+
+    def send_move(self, dx: float, dy: float) -> None:
+        # One bad sample must not poison the summed window (nan -> "dx":null drops it all).
+        if not (_fmt_ok(dx) and _fmt_ok(dy)):
+            return
+        if not self._flush_period:
+            self._send_ordered(_move_frame(dx, dy))
+            return
+        with self._coalesce_lock:
+            move = self._pending_move
+            move[0] += dx
+            move[1] += dy
+            self._mark_dirty_locked()
+
+    def send_scroll(self, dy: float) -> None:
+        if not _fmt_ok(dy):
+            return
+        if not self._flush_period:
+            self._send_ordered(_scroll_frame(dy))
+            return
+        with self._coalesce_lock:
+            self._pending_scroll[0] += dy
+            self._mark_dirty_locked()
+
+    def _send_latest(self, key: str, frame: bytes) -> None:
+        if not self._flush_period:
+            self._send_ordered(frame)
+            return
+        with self._coalesce_lock:
+            self._pending_latest[key] = frame
+            self._mark_dirty_locked()
+
+    def send_stick(self, event: str, x: float, y: float) -> None:
+        tmpl = _STICK_TMPL.get(event)
+        if tmpl is not None and _fmt_ok(x) and _fmt_ok(y):
+            frame = tmpl % (x, y)
+        else:
+            frame = _encode_line({"t": "input", "e": event, "d": {"x": x, "y": y}})
+        self._send_latest(event, frame)
+
+    def send_trigger(self, which: str, value: float) -> None:
+        tmpl = _TRIGGER_TMPL.get(which)
+        if tmpl is not None and _fmt_ok(value):
+            frame = tmpl % value
+        else:
+            frame = _encode_line({"t": "input", "e": "pad_trigger", "d": {"which": which, "value": value}})
+        # The phone only sends press/release edges here, so every one must reach the host.
+        self._send_ordered(frame)
+
+    def send_pad_button(self, name: str, down: bool) -> None:
+        frame = _PAD_BUTTON_FRAMES.get((name, down))
+        if frame is None:
+            frame = _encode_line({"t": "input", "e": "pad_button", "d": {"name": name, "down": down}})
+        self._send_ordered(frame)
 
     def rpc(self, method: str, params: dict[str, Any], timeout_s: float = 2.0) -> dict[str, Any]:
         if not self.connected:
             return {"ok": False, "error": "host_not_connected"}
 
         with self._pending_lock:
-            req_id = str(self._next_id)
+            if not self._free_slots:
+                if len(self._slots) > _RPC_SLOT_MASK:
+                    return {"ok": False, "error": "busy"}
+                self._grow_slots(min(len(self._slots), _RPC_SLOT_MASK + 1 - len(self._slots)))
+            idx = self._free_slots.pop()
+            req_id = (self._next_id << _RPC_SLOT_BITS) | idx
             self._next_id += 1
-            ev = threading.Event()
-            box: dict[str, Any] = {}
-            self._pending[req_id] = (ev, box)
+            self._slot_ids[idx] = req_id
+            ev = self._slots[idx]
+            ev.clear()
 
-        sent = self._send_line({"t": "rpc", "id": req_id, "m": method, "p": params})
-        if not sent:
-            with self._pending_lock:
-                self._pending.pop(req_id, None)
-            return {"ok": False, "error": "send_failed"}
-
-        if not ev.wait(timeout_s):
-            with self._pending_lock:
-                self._pending.pop(req_id, None)
-            return {"ok": False, "error": "timeout"}
+        try:
+            sent = self._send_line({"t": "rpc", "id": req_id, "m": method, "p": params})
+            if not sent:
+                return {"ok": False, "error": "send_failed"}
 
-        with self._pending_lock:
-            _ev, result = self._pending.pop(req_id, (ev, box))
+            if not ev.wait(timeout_s):
+                return {"ok": False, "error": "timeout"}
 
-        return {
-            "ok": bool(result.get("ok", False)),
-            "error": result.get("error"),
-            "result": result.get("result"),
-        }
+            result = self._slot_results[idx]
+            return result if result is not None else {"ok": False, "error": "no_result"}
+        finally:
+            with self._pending_lock:
+                self._slot_ids[idx] = 0
+                self._slot_results[idx] = None
+                self._free_slots.append(idx)
 
 
 def maybe_autostart_host() -> None:
@@ -218,7 +571,7 @@ def maybe_autostart_host() -> None:
 
 
 maybe_autostart_host()
-relay = RelayClient(settings.relay_host, settings.relay_port)
+relay = RelayClient(settings.relay_host, settings.relay_port, settings.relay_flush_hz)
 
 
 app = Flask(__name__)
@@ -227,7 +580,7 @@ app.config["SECRET_KEY"] = os.getenv("MEMCTRL_SECRET_KEY", os.urandom(24).hex())
 socketio = SocketIO(
     app,
     cors_allowed_origins=settings.cors_origins,
-    async_mode="threading",
+    async_mode=settings.async_mode,
     logger=settings.socketio_debug,
     engineio_logger=settings.socketio_debug,
     ping_interval=10,
@@ -243,7 +596,7 @@ def require_token_or_403(presented: Optional[str]) -> None:
 @app.get("/")
 def index() -> str:
     require_token_or_403(request.args.get("token"))
-    _log(f"HTTP / ip={request.remote_addr}")
+    _log("HTTP / ip=%s", request.remote_addr)
     return render_template("index.html", token=settings.token or "")
 
 
@@ -256,8 +609,10 @@ def health() -> dict[str, Any]:
     }
 
 
+@functools.lru_cache(maxsize=1)
 def _guess_lan_ip() -> str:
     # Best-effort: does not send packets, just asks OS for the chosen interface.
+    # Cached for the process lifetime; call _guess_lan_ip.cache_clear() after a network change.
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
             s.connect(("8.8.8.8", 80))
@@ -290,7 +645,7 @@ def on_connect(auth: Optional[dict[str, Any]] = None) -> Any:
     if settings.token and presented != settings.token:
         return False
 
-    _log(f"Phone connected ip={request.remote_addr}")
+    _log("Phone connected ip=%s", request.remote_addr)
     relay.send_client_state(
         "connected",
         {
@@ -320,25 +675,26 @@ def on_connect(auth: Optional[dict[str, Any]] = None) -> Any:
 
 @socketio.on("disconnect")
 def on_disconnect() -> None:
-    _log(f"Phone disconnected ip={request.remote_addr}")
+    _log("Phone disconnected ip=%s", request.remote_addr)
     relay.send_client_state("disconnected", {"ip": request.remote_addr})
 
 
 @socketio.on("move")
 def on_move(data: dict[str, Any]) -> None:
-    relay.send_input("move", {"dx": float(data.get("dx") or 0.0), "dy": float(data.get("dy") or 0.0)})
+    # Socket.IO already delivers JSON numbers as Python numbers; no re-coercion on the hot path.
+    relay.send_move(data.get("dx", 0.0), data.get("dy", 0.0))
 
 
 @socketio.on("scroll")
 def on_scroll(data: dict[str, Any]) -> None:
-    relay.send_input("scroll", {"dy": float(data.get("dy") or 0.0)})
+    relay.send_scroll(data.get("dy", 0.0))
 
 
 @socketio.on("click")
 def on_click(data: dict[str, Any]) -> None:
     relay.send_input(
         "click",
-        {"button": str(data.get("button") or "left"), "down": bool(data.get("down", True))},
+        {"button": data.get("button", "left"), "down": bool(data.get("down", True))},
     )
 
 
@@ -354,25 +710,22 @@ def on_key(data: dict[str, Any]) -> None:
 
 @socketio.on("pad_left")
 def on_pad_left(data: dict[str, Any]) -> None:
-    relay.send_input("pad_left", {"x": float(data.get("x") or 0.0), "y": float(data.get("y") or 0.0)})
+    relay.send_stick("pad_left", data.get("x", 0.0), data.get("y", 0.0))
 
 
 @socketio.on("pad_right")
 def on_pad_right(data: dict[str, Any]) -> None:
-    relay.send_input("pad_right", {"x": float(data.get("x") or 0.0), "y": float(data.get("y") or 0.0)})
+    relay.send_stick("pad_right", data.get("x", 0.0), data.get("y", 0.0))
 
 
 @socketio.on("pad_trigger")
 def on_pad_trigger(data: dict[str, Any]) -> None:
-    relay.send_input(
-        "pad_trigger",
-        {"which": str(data.get("which") or ""), "value": float(data.get("value") or 0.0)},
-    )
+    relay.send_trigger(data.get("which", ""), data.get("value", 0.0))
 
 
 @socketio.on("pad_button")
 def on_pad_button(data: dict[str, Any]) -> None:
-    relay.send_input("pad_button", {"name": str(data.get("name") or ""), "down": bool(data.get("down", True))})
+    relay.send_pad_button(str(data.get("name") or ""), bool(data.get("down", True)))
 
 @socketio.on("kbm_cam_move")
 def on_kbm_cam_move(data: dict[str, Any]) -> None:
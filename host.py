@@ -1,9 +1,13 @@
+import array
 import json
-import math
 import os
+import select
+import selectors
 import socket
+import sys
 import threading
 import time
+from collections import deque
 from dataclasses import dataclass
 from typing import Any, Optional
 
@@ -16,6 +20,11 @@ except Exception:  # pragma: no cover
     keyboard = None
     mouse = None
 
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None
+
 
 @dataclass(frozen=True)
 class Settings:
@@ -54,15 +63,289 @@ def load_settings() -> Settings:
 
 settings = load_settings()
 
+# Settings is frozen; the per-event handlers read these instead of going
+# through the settings object every time.
+_MOUSE_SENS = float(settings.mouse_sensitivity)
+_MAX_MOVE_PX = float(settings.max_move_px)
+_MAX_SCROLL = float(settings.max_scroll)
+_JOY_SENS = float(settings.joystick_sensitivity)
+_KBM_CAM_SENS = float(settings.kbm_cam_sens)
+_LOG_INPUT = bool(settings.log_input)
+_LOG_VERBOSE = bool(settings.log_input_verbose)
+
 
 mouse_controller = mouse.Controller() if mouse else None
 keyboard_controller = keyboard.Controller() if keyboard else None
 
 
+user32 = ctypes.WinDLL("user32", use_last_error=True)
+
+user32.GetForegroundWindow.restype = wintypes.HWND
+user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+user32.GetWindowTextW.restype = ctypes.c_int
+user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+user32.SetForegroundWindow.argtypes = [wintypes.HWND]
+user32.SetForegroundWindow.restype = wintypes.BOOL
+user32.ShowWindow.argtypes = [wintypes.HWND, ctypes.c_int]
+user32.ShowWindow.restype = wintypes.BOOL
+
+# Mouse and key injection goes straight to SendInput rather than through pynput's
+# per-call translation. pynput stays as the fallback for keys that need modifiers.
+INPUT_MOUSE = 0
+INPUT_KEYBOARD = 1
+MOUSEEVENTF_MOVE = 0x0001
+MOUSEEVENTF_LEFTDOWN = 0x0002
+MOUSEEVENTF_LEFTUP = 0x0004
+MOUSEEVENTF_RIGHTDOWN = 0x0008
+MOUSEEVENTF_RIGHTUP = 0x0010
+MOUSEEVENTF_MIDDLEDOWN = 0x0020
+MOUSEEVENTF_MIDDLEUP = 0x0040
+MOUSEEVENTF_WHEEL = 0x0800
+KEYEVENTF_EXTENDEDKEY = 0x0001
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+MAPVK_VK_TO_VSC = 0
+WHEEL_DELTA = 120
+
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx", wintypes.LONG),
+        ("dy", wintypes.LONG),
+        ("mouseData", wintypes.DWORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", wintypes.WORD),
+        ("wScan", wintypes.WORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+class HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [("uMsg", wintypes.DWORD), ("wParamL", wintypes.WORD), ("wParamH", wintypes.WORD)]
+
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT), ("hi", HARDWAREINPUT)]
+
+
+class INPUT(ctypes.Structure):
+    _anonymous_ = ("u",)
+    _fields_ = [("type", wintypes.DWORD), ("u", _INPUTUNION)]
+
+
+user32.SendInput.argtypes = [wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int]
+user32.SendInput.restype = wintypes.UINT
+user32.VkKeyScanW.argtypes = [wintypes.WCHAR]
+user32.VkKeyScanW.restype = ctypes.c_short
+user32.MapVirtualKeyW.argtypes = [wintypes.UINT, wintypes.UINT]
+user32.MapVirtualKeyW.restype = wintypes.UINT
+
+_INPUT_SIZE = ctypes.sizeof(INPUT)
+
+
+class _InputBatch:
+    # Per-thread INPUT array. Outside deferred mode every event is submitted at once;
+    # a thread that turns deferred on (relay loop, mouse mover) calls flush() itself
+    # and gets everything queued since the last flush in a single SendInput.
+    def __init__(self, size: int = 16) -> None:
+        self._buf = (INPUT * size)()
+        self._n = 0
+        self.deferred = False
+
+    def _slot(self) -> INPUT:
+        if self._n == len(self._buf):
+            self.flush()
+        inp = self._buf[self._n]
+        self._n += 1
+        return inp
+
+    def mouse(self, flags: int, dx: int = 0, dy: int = 0, data: int = 0) -> None:
+        inp = self._slot()
+        inp.type = INPUT_MOUSE
+        mi = inp.mi
+        mi.dx = dx
+        mi.dy = dy
+        mi.mouseData = data & 0xFFFFFFFF
+        mi.dwFlags = flags
+        mi.time = 0
+        mi.dwExtraInfo = 0
+        if not self.deferred:
+            self.flush()
+
+    def key(self, vk: int, scan: int, flags: int) -> None:
+        inp = self._slot()
+        inp.type = INPUT_KEYBOARD
+        ki = inp.ki
+        ki.wVk = vk
+        ki.wScan = scan
+        ki.dwFlags = flags
+        ki.time = 0
+        ki.dwExtraInfo = 0
+        if not self.deferred:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._n:
+            user32.SendInput(self._n, self._buf, _INPUT_SIZE)
+            self._n = 0
+
+
+_batch_local = threading.local()
+
+
+def _input_batch() -> _InputBatch:
+    batch = getattr(_batch_local, "batch", None)
+    if batch is None:
+        batch = _batch_local.batch = _InputBatch()
+    return batch
+
+
+def _mouse_move(dx: int, dy: int) -> None:
+    _input_batch().mouse(MOUSEEVENTF_MOVE, dx, dy)
+
+
+_MOUSE_BUTTON_FLAGS = {
+    "left": (MOUSEEVENTF_LEFTDOWN, MOUSEEVENTF_LEFTUP),
+    "right": (MOUSEEVENTF_RIGHTDOWN, MOUSEEVENTF_RIGHTUP),
+    "middle": (MOUSEEVENTF_MIDDLEDOWN, MOUSEEVENTF_MIDDLEUP),
+}
+
+
+def _mouse_button(name: str, down: bool) -> None:
+    down_flag, up_flag = _MOUSE_BUTTON_FLAGS.get(name) or _MOUSE_BUTTON_FLAGS["left"]
+    _input_batch().mouse(down_flag if down else up_flag)
+
+
+# (virtual key, extended) for the named keys the phone UI sends.
+_VK_SPECIAL = {
+    "enter": (0x0D, False),
+    "backspace": (0x08, False),
+    "tab": (0x09, False),
+    "esc": (0x1B, False),
+    "space": (0x20, False),
+    "up": (0x26, True),
+    "down": (0x28, True),
+    "left": (0x25, True),
+    "right": (0x27, True),
+    "shift": (0xA0, False),
+    "ctrl": (0xA2, False),
+    "alt": (0xA4, False),
+    "cmd": (0x5B, True),
+}
+# Only the fixed _VK_SPECIAL keys are cached: names come off the network, and
+# VkKeyScanW results for characters follow the active keyboard layout.
+_key_codes: dict[str, tuple[int, int, int]] = {}
+
+
+def _key_code(name: str) -> Optional[tuple[int, int, int]]:
+    code = _key_codes.get(name)
+    if code is not None:
+        return code
+    special = _VK_SPECIAL.get(name)
+    if special:
+        vk, extended = special
+        code = (vk, user32.MapVirtualKeyW(vk, MAPVK_VK_TO_VSC), KEYEVENTF_EXTENDEDKEY if extended else 0)
+        _key_codes[name] = code
+        return code
+    if len(name) != 1:
+        return None
+    res = user32.VkKeyScanW(name)
+    # Characters that need Shift/AltGr (or have no key) stay with pynput.
+    if res == -1 or res & 0xFF00:
+        return None
+    vk = res & 0xFF
+    return (vk, user32.MapVirtualKeyW(vk, MAPVK_VK_TO_VSC), 0)
+
+
+def _key_event(name: str, down: bool) -> bool:
+    code = _key_code(name)
+    if code is not None:
+        vk, scan, flags = code
+        _input_batch().key(vk, scan, flags if down else flags | KEYEVENTF_KEYUP)
+        return True
+    if not keyboard_controller:
+        return False
+    key_obj = _handle_key(name)
+    if key_obj is None:
+        return False
+    # pynput injects immediately; anything batched before this key must land first.
+    _input_batch().flush()
+    if down:
+        keyboard_controller.press(key_obj)
+    else:
+        keyboard_controller.release(key_obj)
+    return True
+
+
+# Sent as real key presses; as KEYEVENTF_UNICODE most apps ignore them.
+_TYPE_CONTROL_KEYS = {0x0A: "enter", 0x09: "tab"}
+
+
+def _type_text(text: str) -> None:
+    # The whole string goes out in one SendInput: a down/up pair per UTF-16 code
+    # unit (so characters outside the BMP arrive as surrogate pairs).
+    units = array.array("H")
+    units.frombytes(text.replace("\r\n", "\n").replace("\r", "\n").encode("utf-16-le"))
+    buf = (INPUT * (2 * len(units)))()
+    i = 0
+    for u in units:
+        name = _TYPE_CONTROL_KEYS.get(u)
+        code = _key_code(name) if name else None
+        if code is not None:
+            vk, scan, flags = code
+        else:
+            vk, scan, flags = 0, u, KEYEVENTF_UNICODE
+        for f in (flags, flags | KEYEVENTF_KEYUP):
+            inp = buf[i]
+            inp.type = INPUT_KEYBOARD
+            inp.ki.wVk = vk
+            inp.ki.wScan = scan
+            inp.ki.dwFlags = f
+            i += 1
+    # Keep ordering with anything already queued on this thread.
+    _input_batch().flush()
+    user32.SendInput(i, buf, _INPUT_SIZE)
+
+
+_PAD_FLUSH_HZ = 250.0
+_pad_wake = threading.Event()
+
+
+def _clamp(v: float, lo: float, hi: float) -> float:
+    # Conditional form; cheaper than max(lo, min(hi, v)) on the per-event paths.
+    return lo if v < lo else (hi if v > hi else v)
+
+
+def _scale_stick(x: float, y: float, k: float) -> tuple[float, float]:
+    # Both axes in one call; sticks are the highest-rate pad events.
+    x *= k
+    y *= k
+    x = -1.0 if x < -1.0 else (1.0 if x > 1.0 else x)
+    y = -1.0 if y < -1.0 else (1.0 if y > 1.0 else y)
+    return x, y
+
+
 class GamepadAdapter:
+    # Resolved from vgamepad's XUSB_BUTTON the first time a pad is created; the
+    # adapter is recreated on every mode switch / pad_reset, the table isn't.
+    _BTN_MAP: Optional[dict[str, Any]] = None
+
     def __init__(self, enabled: bool) -> None:
         self._pad = None
         self._buttons = None
+        self._btn_map: dict[str, Any] = {}
+        # Report changed since the last update(); pushed by _pad_flush_loop.
+        self._dirty = False
         self._ready = False
         self._error: Optional[str] = None
 
@@ -74,6 +357,9 @@ class GamepadAdapter:
 
             self._pad = vg.VX360Gamepad()
             self._buttons = vg.XUSB_BUTTON
+            if GamepadAdapter._BTN_MAP is None:
+                GamepadAdapter._BTN_MAP = self._button_map(self._buttons)
+            self._btn_map = GamepadAdapter._BTN_MAP
             self._pad.update()
             self._ready = True
         except Exception as e:
@@ -82,6 +368,25 @@ class GamepadAdapter:
             self._ready = False
             self._error = repr(e)
 
+    @staticmethod
+    def _button_map(b: Any) -> dict[str, Any]:
+        return {
+            "a": b.XUSB_GAMEPAD_A,
+            "b": b.XUSB_GAMEPAD_B,
+            "x": b.XUSB_GAMEPAD_X,
+            "y": b.XUSB_GAMEPAD_Y,
+            "lb": b.XUSB_GAMEPAD_LEFT_SHOULDER,
+            "rb": b.XUSB_GAMEPAD_RIGHT_SHOULDER,
+            "back": b.XUSB_GAMEPAD_BACK,
+            "start": b.XUSB_GAMEPAD_START,
+            "ls": b.XUSB_GAMEPAD_LEFT_THUMB,
+            "rs": b.XUSB_GAMEPAD_RIGHT_THUMB,
+            "dup": b.XUSB_GAMEPAD_DPAD_UP,
+            "ddown": b.XUSB_GAMEPAD_DPAD_DOWN,
+            "dleft": b.XUSB_GAMEPAD_DPAD_LEFT,
+            "dright": b.XUSB_GAMEPAD_DPAD_RIGHT,
+        }
+
     @property
     def ready(self) -> bool:
         return self._ready
@@ -93,55 +398,49 @@ class GamepadAdapter:
     def set_left_stick(self, x: float, y: float) -> None:
         if not self._ready:
             return
-        x = max(-1.0, min(1.0, x * settings.joystick_sensitivity))
-        y = max(-1.0, min(1.0, y * settings.joystick_sensitivity))
+        x, y = _scale_stick(x, y, _JOY_SENS)
         self._pad.left_joystick_float(x_value_float=x, y_value_float=y)
-        self._pad.update()
+        self._mark_dirty()
 
     def set_right_stick(self, x: float, y: float) -> None:
         if not self._ready:
             return
-        x = max(-1.0, min(1.0, x * settings.joystick_sensitivity))
-        y = max(-1.0, min(1.0, y * settings.joystick_sensitivity))
+        x, y = _scale_stick(x, y, _JOY_SENS)
         self._pad.right_joystick_float(x_value_float=x, y_value_float=y)
-        self._pad.update()
+        self._mark_dirty()
 
     def set_trigger(self, which: str, value: float) -> None:
         if not self._ready:
             return
-        value = max(0.0, min(1.0, value))
+        value = _clamp(value, 0.0, 1.0)
         if which == "lt":
             self._pad.left_trigger_float(value_float=value)
         elif which == "rt":
             self._pad.right_trigger_float(value_float=value)
-        self._pad.update()
+        self._mark_dirty()
 
     def set_button(self, name: str, pressed: bool) -> None:
         if not self._ready:
             return
-        mapping = {
-            "a": self._buttons.XUSB_GAMEPAD_A,
-            "b": self._buttons.XUSB_GAMEPAD_B,
-            "x": self._buttons.XUSB_GAMEPAD_X,
-            "y": self._buttons.XUSB_GAMEPAD_Y,
-            "lb": self._buttons.XUSB_GAMEPAD_LEFT_SHOULDER,
-            "rb": self._buttons.XUSB_GAMEPAD_RIGHT_SHOULDER,
-            "back": self._buttons.XUSB_GAMEPAD_BACK,
-            "start": self._buttons.XUSB_GAMEPAD_START,
-            "ls": self._buttons.XUSB_GAMEPAD_LEFT_THUMB,
-            "rs": self._buttons.XUSB_GAMEPAD_RIGHT_THUMB,
-            "dup": self._buttons.XUSB_GAMEPAD_DPAD_UP,
-            "ddown": self._buttons.XUSB_GAMEPAD_DPAD_DOWN,
-            "dleft": self._buttons.XUSB_GAMEPAD_DPAD_LEFT,
-            "dright": self._buttons.XUSB_GAMEPAD_DPAD_RIGHT,
-        }
-        btn = mapping.get(name)
-        if not btn:
+        btn = self._btn_map.get(name)
+        if btn is None:
             return
         if pressed:
             self._pad.press_button(button=btn)
         else:
             self._pad.release_button(button=btn)
+        self._mark_dirty()
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+        if not _pad_wake.is_set():
+            _pad_wake.set()
+
+    def flush(self) -> None:
+        if not self._dirty or not self._ready:
+            return
+        # Clear first so a change racing the update() is sent on the next pass.
+        self._dirty = False
         self._pad.update()
 
 
@@ -152,71 +451,186 @@ input_mode = 0 if int(settings.input_mode) == 0 else 1
 gamepad = GamepadAdapter(gamepad_enabled and input_mode == 0)
 
 
+def _pad_flush_loop() -> None:
+    # One ViGEm report per burst of pad events, at most _PAD_FLUSH_HZ per second.
+    # Always flushes whichever adapter is current, so recreating it needs no new thread.
+    period = 1.0 / _PAD_FLUSH_HZ
+    last = 0.0
+    while True:
+        _pad_wake.wait()
+        _pad_wake.clear()
+        wait = last + period - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+        last = time.perf_counter()
+        try:
+            gamepad.flush()
+        except Exception:
+            pass
+
+
+threading.Thread(target=_pad_flush_loop, name="pad-flush", daemon=True).start()
+
+
 class MouseMover:
     def __init__(self, hz: int) -> None:
         self._hz = max(60, min(1000, int(hz)))
+        # Lock-free handoff: every producer thread (relay, kbm-camera) gets its own running
+        # [dx, dy, wheel] totals that only it writes, paired with a matching "taken" mark that
+        # only the mover writes. With one writer per slot nothing needs a mutex under the GIL.
+        self._local = threading.local()
+        self._sources: list[tuple[array.array, array.array]] = []
+        self._sources_lock = threading.Lock()  # Only taken when a new producer thread shows up.
+        # Consumer-side remainder (sub-pixel motion and anything over the per-tick clamp).
         self._dx = 0.0
         self._dy = 0.0
-        self._lock = threading.Lock()
+        self._wheel = 0.0
         self._stop = threading.Event()
+        self._wake = threading.Event()
+        # Windows sleeps in ~15.6 ms steps by default, which would cap a 500 Hz mover at ~64 Hz.
+        self._winmm: Any = None
+        try:
+            self._winmm = ctypes.WinDLL("winmm")
+            self._winmm.timeBeginPeriod(1)
+        except (OSError, AttributeError):
+            self._winmm = None
         self._thread = threading.Thread(target=self._loop, name="mouse-mover", daemon=True)
         self._thread.start()
 
+    def _source(self) -> array.array:
+        totals = getattr(self._local, "totals", None)
+        if totals is None:
+            totals = array.array("d", [0.0, 0.0, 0.0])
+            with self._sources_lock:
+                self._sources = self._sources + [(totals, array.array("d", [0.0, 0.0, 0.0]))]
+            self._local.totals = totals
+        return totals
+
     def add(self, dx: float, dy: float) -> None:
-        with self._lock:
-            self._dx += dx
-            self._dy += dy
+        totals = self._source()
+        totals[0] += dx
+        totals[1] += dy
+        if not self._wake.is_set():
+            self._wake.set()
+
+    def add_scroll(self, clicks: float) -> None:
+        # Wheel deltas landing within one tick go out as a single wheel event.
+        totals = self._source()
+        totals[2] += clicks
+        if not self._wake.is_set():
+            self._wake.set()
+
+    def _drain(self) -> None:
+        for totals, taken in self._sources:
+            tx = totals[0]
+            ty = totals[1]
+            tw = totals[2]
+            self._dx += tx - taken[0]
+            self._dy += ty - taken[1]
+            self._wheel += tw - taken[2]
+            taken[0] = tx
+            taken[1] = ty
+            taken[2] = tw
 
     def _loop(self) -> None:
         if not mouse_controller:
             return
         period = 1.0 / float(self._hz)
-        while not self._stop.is_set():
-            time.sleep(period)
-            with self._lock:
-                dx = max(-settings.max_move_px, min(settings.max_move_px, self._dx))
-                dy = max(-settings.max_move_px, min(settings.max_move_px, self._dy))
-                # Accumulate fractional motion until it crosses whole pixels.
-                mx = int(math.floor(dx)) if dx >= 0 else int(math.ceil(dx))
-                my = int(math.floor(dy)) if dy >= 0 else int(math.ceil(dy))
-                self._dx -= mx
-                self._dy -= my
+        batch = _input_batch()
+        batch.deferred = True
+        backlog = False
+        next_tick = 0.0
+        # Hot loop: bind everything it touches per tick to locals.
+        max_px = _MAX_MOVE_PX
+        stopped = self._stop.is_set
+        wake_wait = self._wake.wait
+        wake_clear = self._wake.clear
+        perf_counter = time.perf_counter
+        sleep = time.sleep
+        drain = self._drain
+        flush = batch.flush
+        # Straight into this thread's preallocated INPUT slots; skips _mouse_move's
+        # thread-local batch lookup on every tick.
+        mouse_input = batch.mouse
+        while not stopped():
+            # Idle: block until add() signals. Motion left over after the per-tick clamp
+            # keeps the loop ticking at the configured rate until it is used up.
+            if not backlog:
+                wake_wait()
+            wake_clear()
+            # Ticks sit on a fixed perf_counter grid so sleep overshoot doesn't accumulate;
+            # events landing before the next tick coalesce into it.
+            slack = next_tick - perf_counter()
+            if slack > 0.0005:
+                sleep(slack)
+            now = perf_counter()
+            next_tick += period
+            if next_tick < now:
+                # Fell behind (or was idle): restart the grid rather than burst to catch up.
+                next_tick = now + period
+            drain()
+            dx = _clamp(self._dx, -max_px, max_px)
+            dy = _clamp(self._dy, -max_px, max_px)
+            # Accumulate fractional motion until it crosses whole pixels (int() truncates toward zero).
+            mx = int(dx)
+            my = int(dy)
+            self._dx -= mx
+            self._dy -= my
+            mw = int(_clamp(self._wheel, -_MAX_SCROLL, _MAX_SCROLL))
+            self._wheel -= mw
+            backlog = abs(self._dx) >= 1.0 or abs(self._dy) >= 1.0 or abs(self._wheel) >= 1.0
             if mx or my:
-                mouse_controller.move(mx, my)
+                mouse_input(MOUSEEVENTF_MOVE, mx, my)
+            if mw:
+                mouse_input(MOUSEEVENTF_WHEEL, data=mw * WHEEL_DELTA)
+            flush()
 
     def stop(self) -> None:
         self._stop.set()
+        self._wake.set()
+        if self._winmm is not None:
+            self._winmm.timeEndPeriod(1)
+            self._winmm = None
 
 
 mouse_mover = MouseMover(settings.mouse_hz)
 
-_stats_lock = threading.Lock()
-_stats: dict[str, int] = {"move": 0, "scroll": 0, "click": 0, "key": 0, "type": 0, "pad": 0}
+_STAT_NAMES = ("move", "scroll", "click", "key", "type", "pad")
+_STAT_MOVE, _STAT_SCROLL, _STAT_CLICK, _STAT_KEY, _STAT_TYPE, _STAT_PAD = range(len(_STAT_NAMES))
+# Only the relay-dispatch thread writes counters; the logger swaps in the spare array
+# (a single GIL-atomic assignment) instead of locking around every bump, and zeroes
+# each retired array a tick later, just before it goes live again.
+_STAT_ZEROS = array.array("Q", bytes(8 * len(_STAT_NAMES)))
+_stats = array.array("Q", _STAT_ZEROS)
+_stats_spare = array.array("Q", _STAT_ZEROS)
 
 
-def _bump(name: str) -> None:
-    if not settings.log_input:
+def _bump(idx: int) -> None:
+    if not _LOG_INPUT:
         return
-    with _stats_lock:
-        _stats[name] = int(_stats.get(name, 0)) + 1
+    _stats[idx] += 1
 
 
 def _stats_loop() -> None:
+    global _stats, _stats_spare
     if not settings.log_input:
         return
     while True:
         time.sleep(1.0)
-        with _stats_lock:
-            snap = dict(_stats)
-            for k in _stats:
-                _stats[k] = 0
-        if any(v for v in snap.values()):
+        # Zero the retired buffer only now, right before it goes live again: a _bump
+        # that loaded it just before last tick's swap has long since stored.
+        spare = _stats_spare
+        spare[:] = _STAT_ZEROS
+        snap = _stats
+        _stats = spare
+        if any(snap):
             sel = selected_window.get("title") or selected_window.get("hwnd") or "none"
             print(
                 "1s stats: "
-                + " ".join(f"{k}={v}" for k, v in snap.items())
+                + " ".join(f"{k}={v}" for k, v in zip(_STAT_NAMES, snap))
                 + f" focus_lock={int(focus_lock_enabled)} sel={sel}"
             )
+        _stats_spare = snap
 
 
 if settings.log_input:
@@ -224,6 +638,21 @@ if settings.log_input:
 
 
 class KbmMapper:
+    # Reasonable default mapping; can be refined later.
+    _MAPPING = {
+        "a": "space",
+        "b": "c",
+        "x": "r",
+        "y": "e",
+        "back": "esc",
+        "start": "enter",
+        "dup": "up",
+        "ddown": "down",
+        "dleft": "left",
+        "dright": "right",
+    }
+    _MODMAP = {"lb": "shift", "rb": "ctrl"}
+
     def __init__(self) -> None:
         self._w = False
         self._a = False
@@ -231,8 +660,8 @@ class KbmMapper:
         self._d = False
         self._lmb = False
         self._rmb = False
-        self._rmb_trigger = False
-        self._camera_active = False
+        # Reasons to hold RMB: bit 0 = LT trigger, bit 1 = camera drag in use.
+        self._rmb_want = 0
         self.camera_drag = False
         self._shift = False
         self._ctrl = False
@@ -249,32 +678,30 @@ class KbmMapper:
     def stop(self) -> None:
         self._stop.set()
 
-    def _press(self, key: Any) -> None:
-        if keyboard_controller:
-            keyboard_controller.press(key)
+    def _press(self, key: str) -> None:
+        _key_event(key, True)
 
-    def _release(self, key: Any) -> None:
-        if keyboard_controller:
-            keyboard_controller.release(key)
+    def _release(self, key: str) -> None:
+        _key_event(key, False)
 
-    def _mouse_down(self, btn: Any) -> None:
+    def _mouse_down(self, btn: str) -> None:
         if mouse_controller:
-            mouse_controller.press(btn)
+            _mouse_button(btn, True)
 
-    def _mouse_up(self, btn: Any) -> None:
+    def _mouse_up(self, btn: str) -> None:
         if mouse_controller:
-            mouse_controller.release(btn)
+            _mouse_button(btn, False)
 
     def _update_rmb(self) -> None:
         if not mouse:
             return
-        want = bool(self._rmb_trigger or (self._camera_active and self.camera_drag))
-        if want and not self._rmb:
-            self._rmb = True
-            self._mouse_down(mouse.Button.right)
-        if not want and self._rmb:
-            self._rmb = False
-            self._mouse_up(mouse.Button.right)
+        want = self._rmb_want != 0
+        if want != self._rmb:
+            self._rmb = want
+            if want:
+                self._mouse_down("right")
+            else:
+                self._mouse_up("right")
 
     def set_left_stick(self, x: float, y: float) -> None:
         # WASD mapping with deadzone/threshold.
@@ -309,12 +736,12 @@ class KbmMapper:
     def camera_move(self, dx: float, dy: float) -> None:
         if not mouse_controller:
             return
-        dx = float(dx) * float(settings.kbm_cam_sens)
-        dy = float(dy) * float(settings.kbm_cam_sens)
+        dx = dx * _KBM_CAM_SENS
+        dy = dy * _KBM_CAM_SENS
         mouse_mover.add(dx, dy)
 
     def set_camera_active(self, active: bool) -> None:
-        self._camera_active = bool(active)
+        self._rmb_want = (self._rmb_want & ~2) | (2 if active and self.camera_drag else 0)
         self._update_rmb()
 
     def set_trigger(self, which: str, value: float) -> None:
@@ -325,51 +752,30 @@ class KbmMapper:
         if which == "rt":
             if down and not self._lmb:
                 self._lmb = True
-                self._mouse_down(mouse.Button.left)
+                self._mouse_down("left")
             if not down and self._lmb:
                 self._lmb = False
-                self._mouse_up(mouse.Button.left)
+                self._mouse_up("left")
         elif which == "lt":
-            self._rmb_trigger = bool(down)
+            self._rmb_want = (self._rmb_want & ~1) | down
             self._update_rmb()
 
     def set_button(self, name: str, pressed: bool) -> None:
-        # Reasonable default mapping; can be refined later.
-        mapping = {
-            "a": "space",
-            "b": "c",
-            "x": "r",
-            "y": "e",
-            "back": "esc",
-            "start": "enter",
-            "dup": "up",
-            "ddown": "down",
-            "dleft": "left",
-            "dright": "right",
-        }
-        modmap = {"lb": "shift", "rb": "ctrl"}
-
-        if name in modmap:
-            key = modmap[name]
-            if not keyboard:
-                return
-            key_obj = keyboard.Key.shift if key == "shift" else keyboard.Key.ctrl
+        key = self._MODMAP.get(name)
+        if key:
             if pressed:
-                self._press(key_obj)
+                self._press(key)
             else:
-                self._release(key_obj)
+                self._release(key)
             return
 
-        keyname = mapping.get(name)
+        keyname = self._MAPPING.get(name)
         if not keyname:
             return
-        key_obj = _handle_key(keyname)
-        if key_obj is None:
-            return
         if pressed:
-            self._press(key_obj)
+            self._press(keyname)
         else:
-            self._release(key_obj)
+            self._release(keyname)
 
     def release_all(self) -> None:
         # Release movement + mouse buttons.
@@ -379,16 +785,15 @@ class KbmMapper:
         self._w = self._a = self._s = self._d = False
 
         if mouse and self._lmb:
-            self._mouse_up(mouse.Button.left)
-        self._rmb_trigger = False
-        self._camera_active = False
+            self._mouse_up("left")
+        self._rmb_want = 0
         self._update_rmb()
         self._lmb = self._rmb = False
 
-        if keyboard and self._shift:
-            self._release(keyboard.Key.shift)
-        if keyboard and self._ctrl:
-            self._release(keyboard.Key.ctrl)
+        if self._shift:
+            self._release("shift")
+        if self._ctrl:
+            self._release("ctrl")
         self._shift = self._ctrl = False
 
         with self._lock:
@@ -402,40 +807,35 @@ class KbmMapper:
         period = 1.0 / hz
         speed = float(os.getenv("MEMCTRL_KBM_CAM_SPEED", "18.0"))
         deadzone = 0.12
-        while not self._stop.is_set():
-            time.sleep(period)
-            with self._lock:
+        stopped = self._stop.is_set
+        sleep = time.sleep
+        lock = self._lock
+        add = mouse_mover.add
+        while not stopped():
+            sleep(period)
+            with lock:
                 x = self._right_x
                 y = self._right_y
             moving = not (abs(x) < deadzone and abs(y) < deadzone)
             if not moving:
                 continue
-            mouse_mover.add(x * speed, -y * speed)
+            add(x * speed, -y * speed)
 
 
 kbm = KbmMapper()
 
 
-user32 = ctypes.WinDLL("user32", use_last_error=True)
+SW_RESTORE = 9
 
-user32.GetForegroundWindow.restype = wintypes.HWND
-user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
-user32.GetWindowTextW.restype = ctypes.c_int
-user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
-user32.GetWindowThreadProcessId.restype = wintypes.DWORD
-user32.SetForegroundWindow.argtypes = [wintypes.HWND]
-user32.SetForegroundWindow.restype = wintypes.BOOL
-user32.ShowWindow.argtypes = [wintypes.HWND, ctypes.c_int]
-user32.ShowWindow.restype = wintypes.BOOL
 
-SW_RESTORE = 9
+# Reused by _window_text; only the relay-dispatch thread (RPC handlers) calls it.
+_WND_BUF = ctypes.create_unicode_buffer(512)
 
 
 def _window_text(hwnd: int) -> str:
-    buf = ctypes.create_unicode_buffer(512)
-    if user32.GetWindowTextW(wintypes.HWND(hwnd), buf, len(buf)) <= 0:
+    if user32.GetWindowTextW(wintypes.HWND(hwnd), _WND_BUF, len(_WND_BUF)) <= 0:
         return ""
-    return str(buf.value)
+    return str(_WND_BUF.value)
 
 
 def _foreground_window_info() -> dict[str, Any]:
@@ -469,7 +869,7 @@ def _maybe_refocus() -> None:
     hwnd = int(selected_window.get("hwnd") or 0)
     if not hwnd:
         return
-    now = time.time()
+    now = time.monotonic()
     if now - _last_focus_attempt < 0.4:
         return
     _last_focus_attempt = now
@@ -495,6 +895,19 @@ def _status_payload() -> dict[str, Any]:
     return payload
 
 
+# Encoded status frame, reused for every hello/connect until an RPC changes state.
+# Status fields only change inside RPC handlers, so _handle_rpc clears it.
+_status_bytes: Optional[bytes] = None
+
+
+def _status_line() -> bytes:
+    global _status_bytes
+    line = _status_bytes
+    if line is None:
+        line = _status_bytes = _encode_line(_status_payload())
+    return line
+
+
 def _set_gamepad_enabled(enabled: bool) -> dict[str, Any]:
     global gamepad_enabled, gamepad
     enabled = bool(enabled)
@@ -510,6 +923,7 @@ def _set_gamepad_enabled(enabled: bool) -> dict[str, Any]:
             if getattr(gamepad, "ready", False) and getattr(gamepad, "_pad", None) is not None:
                 pad = getattr(gamepad, "_pad")
                 if hasattr(pad, "reset"):
+                    gamepad._dirty = False
                     pad.reset()
                     pad.update()
         except Exception:
@@ -522,86 +936,233 @@ def _set_gamepad_enabled(enabled: bool) -> dict[str, Any]:
     return _status_snapshot()
 
 
-def _handle_rpc(method: str, params: dict[str, Any]) -> dict[str, Any]:
-    global focus_lock_enabled, selected_window, gamepad, input_mode, kbm_camera_drag_enabled
-
-    if method == "select_foreground_window":
-        selected_window = _foreground_window_info()
-        # Selecting a window implies "gaming mode".
-        if int(selected_window.get("hwnd") or 0):
-            focus_lock_enabled = True
-            _set_gamepad_enabled(True)
-        return _status_snapshot()
+def _rpc_select_foreground_window(params: dict[str, Any]) -> dict[str, Any]:
+    global focus_lock_enabled, selected_window
+    selected_window = _foreground_window_info()
+    # Selecting a window implies "gaming mode".
+    if int(selected_window.get("hwnd") or 0):
+        focus_lock_enabled = True
+        _set_gamepad_enabled(True)
+    return _status_snapshot()
 
-    if method == "get_selected_window":
-        return _status_snapshot()
 
-    if method == "set_focus_lock":
-        focus_lock_enabled = bool(params.get("enabled", False))
-        if focus_lock_enabled and int(selected_window.get("hwnd") or 0):
-            _set_gamepad_enabled(True)
-        return _status_snapshot()
+def _rpc_status(params: dict[str, Any]) -> dict[str, Any]:
+    return _status_snapshot()
 
-    if method == "set_gamepad_enabled":
-        return _set_gamepad_enabled(bool(params.get("enabled", False)))
-
-    if method == "set_input_mode":
-        new_mode = int(params.get("mode", 0))
-        new_mode = 0 if new_mode == 0 else 1
-        if new_mode != input_mode:
-            input_mode = new_mode
-            # Recreate/destroy virtual device depending on mode.
-            if input_mode == 0 and gamepad_enabled:
-                gamepad = GamepadAdapter(True)
-            if input_mode == 1:
-                gamepad = GamepadAdapter(False)
-                kbm.release_all()
-        return _status_snapshot()
 
-    if method == "set_kbm_camera_drag":
-        kbm_camera_drag_enabled = bool(params.get("enabled", False))
-        kbm.camera_drag = bool(kbm_camera_drag_enabled)
-        return _status_snapshot()
+def _rpc_set_focus_lock(params: dict[str, Any]) -> dict[str, Any]:
+    global focus_lock_enabled
+    focus_lock_enabled = bool(params.get("enabled", False))
+    if focus_lock_enabled and int(selected_window.get("hwnd") or 0):
+        _set_gamepad_enabled(True)
+    return _status_snapshot()
 
-    if method == "pad_reset":
-        # Reset is meaningful only if enabled.
-        if not gamepad_enabled:
-            return _status_snapshot()
-        if input_mode == 0:
+
+def _rpc_set_gamepad_enabled(params: dict[str, Any]) -> dict[str, Any]:
+    return _set_gamepad_enabled(bool(params.get("enabled", False)))
+
+
+def _rpc_set_input_mode(params: dict[str, Any]) -> dict[str, Any]:
+    global gamepad, input_mode
+    new_mode = int(params.get("mode", 0))
+    new_mode = 0 if new_mode == 0 else 1
+    if new_mode != input_mode:
+        input_mode = new_mode
+        # Recreate/destroy virtual device depending on mode.
+        if input_mode == 0 and gamepad_enabled:
             gamepad = GamepadAdapter(True)
-        return _status_snapshot()
+        if input_mode == 1:
+            gamepad = GamepadAdapter(False)
+            kbm.release_all()
+    return _status_snapshot()
+
+
+def _rpc_set_kbm_camera_drag(params: dict[str, Any]) -> dict[str, Any]:
+    global kbm_camera_drag_enabled
+    kbm_camera_drag_enabled = bool(params.get("enabled", False))
+    kbm.camera_drag = bool(kbm_camera_drag_enabled)
+    return _status_snapshot()
+
 
-    if method == "gamepad_status":
+def _rpc_pad_reset(params: dict[str, Any]) -> dict[str, Any]:
+    global gamepad
+    # Reset is meaningful only if enabled.
+    if not gamepad_enabled:
         return _status_snapshot()
+    if input_mode == 0:
+        gamepad = GamepadAdapter(True)
+    return _status_snapshot()
 
-    return {"error": "unknown_method"}
 
+_RPC_TABLE: dict[str, Any] = {
+    "select_foreground_window": _rpc_select_foreground_window,
+    "get_selected_window": _rpc_status,
+    "set_focus_lock": _rpc_set_focus_lock,
+    "set_gamepad_enabled": _rpc_set_gamepad_enabled,
+    "set_input_mode": _rpc_set_input_mode,
+    "set_kbm_camera_drag": _rpc_set_kbm_camera_drag,
+    "pad_reset": _rpc_pad_reset,
+    "gamepad_status": _rpc_status,
+}
 
-def _send_line(sock: socket.socket, payload: dict[str, Any]) -> None:
-    sock.sendall((json.dumps(payload, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8"))
 
+def _handle_rpc(method: str, params: dict[str, Any]) -> dict[str, Any]:
+    global _status_bytes
+    fn = _RPC_TABLE.get(method)
+    if fn is None:
+        return {"error": "unknown_method"}
+    try:
+        return fn(params)
+    finally:
+        _status_bytes = None
 
-def _read_lines(sock: socket.socket) -> Any:
-    buf = b""
-    while True:
-        chunk = sock.recv(4096)
-        if not chunk:
-            return
-        buf += chunk
-        while b"\n" in buf:
-            line, buf = buf.split(b"\n", 1)
-            if not line:
-                continue
-            try:
-                yield json.loads(line.decode("utf-8"))
-            except Exception:
-                continue
 
+def _encode_line(payload: dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(payload, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
 
-def _handle_key(name: str) -> Optional[Any]:
-    if not keyboard:
-        return None
-    special = {
+
+def _encode_value(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _rpc_result_line(req_id: Any, ok: bool, result: Any, error: Any) -> bytes:
+    # Fixed framing around the few varying fields. app.py routes replies by matching
+    # the leading '{"t":"rpc_result","id":' bytes, so that prefix must stay first.
+    return b"".join((
+        b'{"t":"rpc_result","id":',
+        _encode_value(req_id),
+        b',"ok":true,"result":' if ok else b',"ok":false,"result":',
+        _encode_value(result),
+        b',"error":',
+        _encode_value(error),
+        b"}\n",
+    ))
+
+
+def _decode_line(line: Any) -> Any:
+    # Accepts bytes or a memoryview into the receive buffer.
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(bytes(line))
+
+
+_RELAY_SOCK_BUF = 256 * 1024
+_TCP_QUICKACK = getattr(socket, "TCP_QUICKACK", None)  # Linux only
+_SIO_LOOPBACK_FAST_PATH = getattr(socket, "SIO_LOOPBACK_FAST_PATH", None)  # Windows only
+
+
+def _tune_listener(sock: socket.socket) -> None:
+    # Set before listen(): accepted sockets inherit the buffer sizes, and the
+    # loopback fast path only takes effect if both ends enable it pre-connect.
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _RELAY_SOCK_BUF)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _RELAY_SOCK_BUF)
+    if _SIO_LOOPBACK_FAST_PATH is not None:
+        try:
+            sock.ioctl(_SIO_LOOPBACK_FAST_PATH, True)
+        except OSError:
+            pass
+
+
+def _tune_conn(sock: socket.socket) -> None:
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    # Notice a relay that vanished without a FIN instead of waiting on it forever.
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    if _TCP_QUICKACK is not None:
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, _TCP_QUICKACK, 1)
+        except OSError:
+            pass
+
+
+def _send_bytes(sock: socket.socket, data: bytes) -> None:
+    # The relay socket is non-blocking while _read_lines owns it; wait for
+    # room instead of letting sendall bail out half way through a frame.
+    view = memoryview(data)
+    while view:
+        try:
+            n = sock.send(view)
+        except BlockingIOError:
+            select.select([], [sock], [])
+            continue
+        view = view[n:]
+
+
+def _read_lines(sock: socket.socket, on_drain: Optional[Any] = None) -> Any:
+    sock.setblocking(False)
+    sel = selectors.DefaultSelector()
+    sel.register(sock, selectors.EVENT_READ)
+    # recv_into writes straight into the free tail of one reusable buffer;
+    # [start, end) holds received bytes not yet consumed as lines.
+    buf = bytearray(65536)
+    view = memoryview(buf)
+    start = end = 0
+    try:
+        while True:
+            # Every complete line received so far has been handled; about to block.
+            if on_drain is not None:
+                on_drain()
+            sel.select()
+            # Everything before the old end was already scanned and holds no newline.
+            scan = end
+            eof = False
+            # Pull in everything already queued so one wake handles the whole burst.
+            while True:
+                if end == len(buf):
+                    if start:
+                        buf[: end - start] = view[start:end]
+                        scan -= start
+                        end -= start
+                        start = 0
+                    else:
+                        # One frame larger than the whole buffer; grow it.
+                        view.release()
+                        buf.extend(bytes(len(buf)))
+                        view = memoryview(buf)
+                try:
+                    n = sock.recv_into(view[end:])
+                except BlockingIOError:
+                    break
+                if not n:
+                    eof = True
+                    break
+                end += n
+                if end < len(buf):
+                    break
+            while True:
+                nl = buf.find(b"\n", scan, end)
+                if nl < 0:
+                    break
+                line_start = start
+                start = scan = nl + 1
+                if nl == line_start:
+                    continue
+                # Decode straight from the buffer. The slice view is dropped before
+                # yielding so nothing still pins the buffer when it has to grow.
+                try:
+                    msg = _decode_line(view[line_start:nl])
+                except ValueError:
+                    continue
+                yield msg
+            if eof:
+                return
+            # Slide leftovers down only once they sit past the midpoint, so the copy is amortized.
+            if start == end:
+                start = end = 0
+            elif start > len(buf) // 2:
+                buf[: end - start] = view[start:end]
+                end -= start
+                start = 0
+    finally:
+        view.release()
+        sel.close()
+
+
+_SPECIAL_KEYS: dict[str, Any] = (
+    {
         "enter": keyboard.Key.enter,
         "backspace": keyboard.Key.backspace,
         "tab": keyboard.Key.tab,
@@ -616,160 +1177,321 @@ def _handle_key(name: str) -> Optional[Any]:
         "alt": keyboard.Key.alt,
         "cmd": keyboard.Key.cmd,
     }
-    if name in special:
-        return special[name]
+    if keyboard
+    else {}
+)
+
+
+def _handle_key(name: str) -> Optional[Any]:
+    if not keyboard:
+        return None
+    # Single characters are the common case while typing.
     if len(name) == 1:
         return name
-    return None
+    return _SPECIAL_KEYS.get(name)
 
 
-def _handle_input(event: str, data: dict[str, Any]) -> None:
-    if event == "move" and mouse_controller:
-        _maybe_refocus()
-        dx = float(data.get("dx") or 0.0) * settings.mouse_sensitivity
-        dy = float(data.get("dy") or 0.0) * settings.mouse_sensitivity
-        mouse_mover.add(dx, dy)
-        _bump("move")
-        if settings.log_input_verbose:
-            print(f"move dx={dx:.2f} dy={dy:.2f}")
+def _on_move(data: dict[str, Any]) -> None:
+    if not mouse_controller:
         return
+    get = data.get
+    dx = get("dx", 0.0) * _MOUSE_SENS
+    dy = get("dy", 0.0) * _MOUSE_SENS
+    mouse_mover.add(dx, dy)
+    _bump(_STAT_MOVE)
+    if _LOG_VERBOSE:
+        print(f"move dx={dx:.2f} dy={dy:.2f}")
+
 
-    if event == "scroll" and mouse_controller:
-        _maybe_refocus()
-        dy = float(data.get("dy") or 0.0)
-        dy = max(-settings.max_scroll, min(settings.max_scroll, dy))
-        mouse_controller.scroll(0, int(dy))
-        _bump("scroll")
-        if settings.log_input_verbose:
-            print(f"scroll dy={dy:.2f}")
+def _on_scroll(data: dict[str, Any]) -> None:
+    if not mouse_controller:
         return
+    dy = data.get("dy", 0.0)
+    dy = -_MAX_SCROLL if dy < -_MAX_SCROLL else (_MAX_SCROLL if dy > _MAX_SCROLL else dy)
+    mouse_mover.add_scroll(dy)
+    _bump(_STAT_SCROLL)
+    if _LOG_VERBOSE:
+        print(f"scroll dy={dy:.2f}")
 
-    if event == "click" and mouse_controller and mouse:
-        _maybe_refocus()
-        button_name = str(data.get("button") or "left")
-        down = bool(data.get("down", True))
-        mapping = {"left": mouse.Button.left, "right": mouse.Button.right, "middle": mouse.Button.middle}
-        btn = mapping.get(button_name, mouse.Button.left)
-        if down:
-            mouse_controller.press(btn)
-        else:
-            mouse_controller.release(btn)
-        _bump("click")
-        if settings.log_input_verbose:
-            print(f"click button={button_name} down={down}")
+
+def _on_click(data: dict[str, Any]) -> None:
+    if not mouse_controller:
         return
+    get = data.get
+    button_name = get("button", "left")
+    down = get("down", True)
+    _mouse_button(button_name, down)
+    _bump(_STAT_CLICK)
+    if _LOG_VERBOSE:
+        print(f"click button={button_name} down={down}")
+
 
-    if event == "type_text" and keyboard_controller:
-        _maybe_refocus()
-        text = str(data.get("text") or "")
-        if text:
-            keyboard_controller.type(text)
-            _bump("type")
-            if settings.log_input_verbose:
-                print(f"type_text len={len(text)}")
+def _on_type_text(data: dict[str, Any]) -> None:
+    if not keyboard_controller:
         return
+    text = data.get("text", "")
+    if text:
+        _type_text(text)
+        _bump(_STAT_TYPE)
+        if _LOG_VERBOSE:
+            print(f"type_text len={len(text)}")
 
-    if event == "key" and keyboard_controller:
-        _maybe_refocus()
-        name = str(data.get("name") or "")
-        down = bool(data.get("down", True))
-        key_obj = _handle_key(name)
-        if key_obj is None:
-            return
-        if down:
-            keyboard_controller.press(key_obj)
-        else:
-            keyboard_controller.release(key_obj)
-        _bump("key")
-        if settings.log_input_verbose:
-            print(f"key name={name} down={down}")
+
+def _on_key(data: dict[str, Any]) -> None:
+    if not keyboard_controller:
+        return
+    get = data.get
+    name = get("name", "")
+    down = get("down", True)
+    if not _key_event(name, down):
         return
+    _bump(_STAT_KEY)
+    if _LOG_VERBOSE:
+        print(f"key name={name} down={down}")
 
-    if event == "pad_left":
-        _maybe_refocus()
-        if not gamepad_enabled:
-            return
-        x = float(data.get("x") or 0.0)
-        y = float(data.get("y") or 0.0)
-        if input_mode == 0:
-            gamepad.set_left_stick(x, y)
-        else:
-            kbm.set_left_stick(x, y)
-        _bump("pad")
+
+def _on_pad_left(data: dict[str, Any]) -> None:
+    if not gamepad_enabled:
         return
+    get = data.get
+    x = get("x", 0.0)
+    y = get("y", 0.0)
+    if input_mode == 0:
+        gamepad.set_left_stick(x, y)
+    else:
+        kbm.set_left_stick(x, y)
+    _bump(_STAT_PAD)
 
-    if event == "pad_right":
-        _maybe_refocus()
-        if not gamepad_enabled:
-            return
-        x = float(data.get("x") or 0.0)
-        y = float(data.get("y") or 0.0)
-        if input_mode == 0:
-            gamepad.set_right_stick(x, y)
-        else:
-            kbm.set_right_stick(x, y)
-        _bump("pad")
+
+def _on_pad_right(data: dict[str, Any]) -> None:
+    if not gamepad_enabled:
         return
+    get = data.get
+    x = get("x", 0.0)
+    y = get("y", 0.0)
+    if input_mode == 0:
+        gamepad.set_right_stick(x, y)
+    else:
+        kbm.set_right_stick(x, y)
+    _bump(_STAT_PAD)
 
-    if event == "pad_trigger":
-        _maybe_refocus()
-        if not gamepad_enabled:
-            return
-        which = str(data.get("which") or "")
-        value = float(data.get("value") or 0.0)
-        if input_mode == 0:
-            gamepad.set_trigger(which, value)
-        else:
-            kbm.set_trigger(which, value)
-        _bump("pad")
+
+def _on_pad_trigger(data: dict[str, Any]) -> None:
+    if not gamepad_enabled:
         return
+    get = data.get
+    which = get("which", "")
+    value = get("value", 0.0)
+    if input_mode == 0:
+        gamepad.set_trigger(which, value)
+    else:
+        kbm.set_trigger(which, value)
+    _bump(_STAT_PAD)
 
-    if event == "pad_button":
-        _maybe_refocus()
-        if not gamepad_enabled:
-            return
-        name = str(data.get("name") or "")
-        down = bool(data.get("down", True))
-        if input_mode == 0:
-            gamepad.set_button(name, down)
-        else:
-            kbm.set_button(name, down)
-        _bump("pad")
+
+def _on_pad_button(data: dict[str, Any]) -> None:
+    if not gamepad_enabled:
         return
+    get = data.get
+    name = get("name", "")
+    down = get("down", True)
+    if input_mode == 0:
+        gamepad.set_button(name, down)
+    else:
+        kbm.set_button(name, down)
+    _bump(_STAT_PAD)
 
-    if event == "kbm_cam_move":
-        _maybe_refocus()
-        if not gamepad_enabled or input_mode != 1:
-            return
-        dx = float(data.get("dx") or 0.0)
-        dy = float(data.get("dy") or 0.0)
-        # Clamp spikes; phone can sometimes produce large deltas on touch resume.
-        dx = max(-120.0, min(120.0, dx))
-        dy = max(-120.0, min(120.0, dy))
-        kbm.camera_move(dx, dy)
-        _bump("pad")
-        if settings.log_input_verbose:
-            print(f"kbm_cam_move dx={dx:.2f} dy={dy:.2f} drag={int(kbm.camera_drag)}")
+
+def _on_kbm_cam_move(data: dict[str, Any]) -> None:
+    if not gamepad_enabled or input_mode != 1:
         return
+    get = data.get
+    dx = get("dx", 0.0)
+    dy = get("dy", 0.0)
+    # Clamp spikes; phone can sometimes produce large deltas on touch resume.
+    dx = _clamp(dx, -120.0, 120.0)
+    dy = _clamp(dy, -120.0, 120.0)
+    kbm.camera_move(dx, dy)
+    _bump(_STAT_PAD)
+    if _LOG_VERBOSE:
+        print(f"kbm_cam_move dx={dx:.2f} dy={dy:.2f} drag={int(kbm.camera_drag)}")
+
+
+def _on_kbm_cam_hold(data: dict[str, Any]) -> None:
+    if not gamepad_enabled or input_mode != 1:
+        return
+    down = data.get("down", False)
+    # Only hold RMB during camera use (as requested).
+    kbm.set_camera_active(down)
+    if _LOG_VERBOSE:
+        print(f"kbm_cam_hold down={int(down)} enabled={int(kbm.camera_drag)}")
+
+
+_INPUT_TABLE: dict[str, Any] = {
+    "move": _on_move,
+    "scroll": _on_scroll,
+    "click": _on_click,
+    "type_text": _on_type_text,
+    "key": _on_key,
+    "pad_left": _on_pad_left,
+    "pad_right": _on_pad_right,
+    "pad_trigger": _on_pad_trigger,
+    "pad_button": _on_pad_button,
+    "kbm_cam_move": _on_kbm_cam_move,
+    "kbm_cam_hold": _on_kbm_cam_hold,
+}
+
+
+_NO_DATA: dict[str, Any] = {}
+
+
+class _RelayDispatcher:
+    # Runs every relay frame on its own thread so a slow SendInput / pynput / ViGEm
+    # call never holds up recv(). One reader, one worker: deque append/popleft are
+    # atomic under the GIL, so the handoff needs no lock.
+    def __init__(self) -> None:
+        self._queue: deque[Any] = deque()
+        # Stick frames carry absolute state, so only the newest per stick is applied:
+        # the reader overwrites a slot, the worker popitem()s it. Triggers stay in the
+        # queue, since each frame is a press/release edge (LMB/RMB in KBM mode).
+        self._latest: dict[str, Any] = {}
+        self._wake = threading.Event()
+        self._conn: Optional[socket.socket] = None
+        self._armed = False
+        self._current_client: dict[str, Any] = {}
+        self._thread = threading.Thread(target=self._loop, name="relay-dispatch", daemon=True)
+        self._thread.start()
 
-    if event == "kbm_cam_hold":
-        _maybe_refocus()
-        if not gamepad_enabled or input_mode != 1:
+    def begin(self, conn: socket.socket) -> None:
+        # Only called between sessions, while the worker is idle.
+        self._conn = conn
+        self._armed = False
+        self._current_client = {}
+
+    def push(self, msg: Any) -> None:
+        if type(msg) is dict and msg.get("t") == "input":
+            e = msg.get("e")
+            if e == "pad_left" or e == "pad_right":
+                self._latest[e] = msg
+                return
+        self._queue.append(msg)
+
+    def wake(self) -> None:
+        # Called by the reader once per received burst, right before it blocks again.
+        if (self._queue or self._latest) and not self._wake.is_set():
+            self._wake.set()
+
+    def end(self) -> None:
+        # Let the worker finish what the reader already queued, then wait for it to
+        # release held keys/buttons before the connection is closed.
+        done = threading.Event()
+        self._queue.append(done)
+        self._wake.set()
+        done.wait()
+
+    def _send(self, data: bytes) -> None:
+        try:
+            _send_bytes(self._conn, data)
+        except OSError:
+            # The reader sees the broken connection and ends the session.
+            pass
+
+    def _loop(self) -> None:
+        # Input handled for one burst of relay frames goes out in a single SendInput.
+        batch = _input_batch()
+        batch.deferred = True
+        queue = self._queue
+        latest = self._latest
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            while queue:
+                msg = queue.popleft()
+                if isinstance(msg, threading.Event):
+                    latest.clear()
+                    self._armed = False
+                    self._current_client = {}
+                    # end() waits on this event; it must fire even if releasing fails,
+                    # or serve_forever never accepts another connection.
+                    try:
+                        kbm.release_all()
+                        batch.flush()
+                    except Exception as exc:
+                        print(f"release on disconnect failed: {exc!r}")
+                    finally:
+                        msg.set()
+                    continue
+                try:
+                    self._dispatch(msg)
+                except Exception:
+                    pass
+            # A slot written while this runs is picked up here or on the next wake.
+            while latest:
+                _, msg = latest.popitem()
+                try:
+                    self._dispatch(msg)
+                except Exception:
+                    pass
+            batch.flush()
+
+    def _dispatch(self, msg: Any) -> None:
+        if type(msg) is not dict:
+            return
+        get = msg.get
+        t = get("t")
+        # Input is nearly every frame; test it before the rare control frames, and
+        # call its handler from here rather than through another function layer.
+        if t == "input":
+            if not self._armed:
+                return
+            event = get("e")
+            data = get("d")
+            # Handlers trust the relay's JSON types; a malformed frame is dropped
+            # here rather than tearing down the relay connection.
+            try:
+                fn = _INPUT_TABLE.get(event)
+                if fn is not None:
+                    # Focus lock is off in the common case; skip the call (and clock read) entirely.
+                    if focus_lock_enabled:
+                        _maybe_refocus()
+                    fn(data if type(data) is dict else _NO_DATA)
+            except (KeyError, TypeError, ValueError):
+                if _LOG_VERBOSE:
+                    print(f"dropped malformed {event!r} event")
+            return
+        if t == "hello":
+            self._send(_status_line())
+            return
+        if t == "rpc":
+            # Echoed back untouched; app.py uses int ids.
+            req_id = msg.get("id")
+            method = msg.get("m")
+            params = msg.get("p") if isinstance(msg.get("p"), dict) else {}
+            try:
+                result = _handle_rpc(method, params)
+                self._send(_rpc_result_line(req_id, "error" not in result, result, result.get("error")))
+            except Exception as e:
+                self._send(_rpc_result_line(req_id, False, None, repr(e)))
+            return
+        if t == "client":
+            state = str(msg.get("state") or "")
+            meta = msg.get("meta") if isinstance(msg.get("meta"), dict) else {}
+            if state == "connected":
+                self._current_client = meta
+                self._armed = True
+                who = meta.get("ip") or "unknown"
+                print(f"Phone connected ({who}); input enabled")
+            elif state == "disconnected":
+                self._armed = False
+                kbm.release_all()
+                print("Phone disconnected; input disabled")
             return
-        down = bool(data.get("down", False))
-        # Only hold RMB during camera use (as requested).
-        kbm.set_camera_active(down)
-        if settings.log_input_verbose:
-            print(f"kbm_cam_hold down={int(down)} enabled={int(kbm.camera_drag)}")
-        return
 
 
 def serve_forever() -> None:
-    armed = False
-    current_client: dict[str, Any] = {}
-
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
         server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        _tune_listener(server)
         server.bind((settings.listen_host, settings.listen_port))
         server.listen(1)
 
@@ -781,65 +1503,31 @@ def serve_forever() -> None:
             print("Tip: run `joy.cpl` to verify the virtual Xbox 360 controller exists.")
         print("Waiting for app.py to connect...")
 
+        dispatcher = _RelayDispatcher()
+
         while True:
             conn, addr = server.accept()
             with conn:
-                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                _tune_conn(conn)
                 print(f"Relay connected from {addr[0]}:{addr[1]}")
-                _send_line(conn, _status_payload())
-
-                armed = False
-                current_client = {}
+                _send_bytes(conn, _status_line())
+                dispatcher.begin(conn)
+                push = dispatcher.push
 
                 try:
-                    for msg in _read_lines(conn):
-                        if not isinstance(msg, dict):
-                            continue
-                        t = msg.get("t")
-                        if t == "hello":
-                            _send_line(conn, _status_payload())
-                            continue
-                        if t == "rpc":
-                            req_id = str(msg.get("id") or "")
-                            method = str(msg.get("m") or "")
-                            params = msg.get("p") if isinstance(msg.get("p"), dict) else {}
-                            try:
-                                result = _handle_rpc(method, params)
-                                ok = "error" not in result
-                                _send_line(conn, {"t": "rpc_result", "id": req_id, "ok": ok, "result": result, "error": result.get("error")})
-                            except Exception as e:
-                                _send_line(conn, {"t": "rpc_result", "id": req_id, "ok": False, "error": repr(e)})
-                            continue
-                        if t == "client":
-                            state = str(msg.get("state") or "")
-                            meta = msg.get("meta") if isinstance(msg.get("meta"), dict) else {}
-                            if state == "connected":
-                                current_client = meta
-                                armed = True
-                                who = meta.get("ip") or "unknown"
-                                print(f"Phone connected ({who}); input enabled")
-                            elif state == "disconnected":
-                                armed = False
-                                kbm.release_all()
-                                print("Phone disconnected; input disabled")
-                            continue
-                        if t == "input":
-                            if not armed:
-                                continue
-                            event = str(msg.get("e") or "")
-                            data = msg.get("d") if isinstance(msg.get("d"), dict) else {}
-                            _handle_input(event, data)
-                            continue
+                    for msg in _read_lines(conn, on_drain=dispatcher.wake):
+                        push(msg)
                 except Exception:
                     pass
                 finally:
-                    armed = False
-                    current_client = {}
-                    kbm.release_all()
+                    dispatcher.end()
                     print("Relay disconnected; waiting...")
 
 
 if __name__ == "__main__":
     # Avoid pynput listener threads staying alive on Ctrl+C.
     threading.current_thread().name = "host-main"
+    # The reader, dispatcher and mouse mover share the GIL; with the default 5 ms
+    # switch interval a parse burst can hold a due mover tick for a whole 500 Hz period.
+    sys.setswitchinterval(0.001)
     serve_forever()